@@ -41,11 +41,11 @@ from app.logging import magnitude_fmt_time
 from app.objects.beatmap import Beatmap
 from app.objects.beatmap import ensure_local_osu_file
 from app.objects.channel import Channel
+from app.objects.match import flush_state_updates
 from app.objects.match import Match
 from app.objects.match import MatchTeams
 from app.objects.match import MatchTeamTypes
 from app.objects.match import MatchWinConditions
-from app.objects.match import Slot
 from app.objects.match import SlotStatus
 from app.objects.menu import Menu
 from app.objects.menu import MenuCommands
@@ -146,6 +146,10 @@ async def bancho_handler(
         for packet in BanchoPacketReader(body_view, packet_map):
             await packet.handle(player)
 
+    # send any match states changed while handling the
+    # packets, so they're included in this response.
+    flush_state_updates()
+
     player.last_recv_time = time.time()
 
     response_data = player.dequeue()
@@ -1237,6 +1241,7 @@ class LobbyJoin(BasePacket):
         for match in app.state.sessions.matches:
             if match is not None:
                 player.enqueue(app.packets.new_match(match))
+                match.invalidate_sent_state()
 
 
 @register(ClientPackets.CREATE_MATCH)
@@ -1302,7 +1307,6 @@ class MatchCreate(BasePacket):
 
         app.state.sessions.matches[match_id] = match
         app.state.sessions.channels.append(chat_channel)
-        match.chat = chat_channel
 
         player.update_latest_activity_soon()
         player.join_match(match, self.match_data.passwd)
@@ -1588,7 +1592,9 @@ class MatchChangeSettings(BasePacket):
 
         player.match.name = self.match_data.name
 
-        player.match.enqueue_state()
+        # force the state to be sent; we may have refused some of
+        # the host's changes, and their client must be overruled.
+        player.match.enqueue_state(force=True)
 
 
 @register(ClientPackets.MATCH_START)
@@ -1640,21 +1646,25 @@ class MatchComplete(BasePacket):
         slot.status = SlotStatus.complete
 
         # check if there are any players that haven't finished.
-        if any([s.status == SlotStatus.playing for s in player.match.slots]):
+        if player.match.playing_count() != 0:
             return
 
         # find any players just sitting in the multi room
         # that have not been playing the map; they don't
         # need to know all the players have completed, only
         # the ones who are playing (just new match info).
-        not_playing = [
+        not_playing = frozenset(
             s.player.id
             for s in player.match.slots
             if s.player is not None and s.status != SlotStatus.complete
-        ]
+        )
 
+        # snapshot who played (& their teams) now; the match's
+        # slots may be reused by the time the scores are in.
         was_playing = [
-            s for s in player.match.slots if s.player and s.player.id not in not_playing
+            (s.player, s.team)
+            for s in player.match.slots
+            if s.player and s.player.id not in not_playing
         ]
 
         player.match.unready_players(expected=SlotStatus.complete)
@@ -1702,10 +1712,6 @@ class MatchChangeMods(BasePacket):
         player.match.enqueue_state()
 
 
-def is_playing(slot: Slot) -> bool:
-    return slot.status == SlotStatus.playing and not slot.loaded
-
-
 @register(ClientPackets.MATCH_LOAD_COMPLETE)
 class MatchLoadComplete(BasePacket):
     async def handle(self, player: Player) -> None:
@@ -1720,7 +1726,7 @@ class MatchLoadComplete(BasePacket):
 
         # check if all players are loaded,
         # if so, tell all players to begin.
-        if not any(map(is_playing, player.match.slots)):
+        if player.match.all_loaded():
             player.match.enqueue(app.packets.match_all_players_loaded(), lobby=False)
 
 
@@ -1789,9 +1795,8 @@ class MatchSkipRequest(BasePacket):
         slot.skipped = True
         player.match.enqueue(app.packets.match_player_skipped(player.id))
 
-        for slot in player.match.slots:
-            if slot.status == SlotStatus.playing and not slot.skipped:
-                return
+        if not player.match.all_skipped():
+            return
 
         # all users have skipped, enqueue a skip.
         player.match.enqueue(app.packets.match_skip(), lobby=False)
@@ -1857,6 +1862,7 @@ class TourneyMatchInfoRequest(BasePacket):
             return  # match not found
 
         player.enqueue(app.packets.update_match(match, send_pw=False))
+        match.invalidate_sent_state()
 
 
 @register(ClientPackets.TOURNAMENT_JOIN_MATCH_CHANNEL)
@@ -1875,15 +1881,18 @@ class TourneyMatchJoinChannel(BasePacket):
         if not match:
             return  # match not found
 
-        for slot in match.slots:
-            if slot.player is not None:
-                if player.id == slot.player.id:
-                    return  # playing in the match
+        # NOTE: tourney clients are separate sessions sharing
+        # the user's id, so compare by id rather than identity.
+        if match.has_player_id(player.id):
+            return  # playing in the match
 
         # attempt to join match chan
         if player.join_channel(match.chat):
             match.tourney_clients.add(player.id)
 
+            # they haven't been sent the last state
+            match.invalidate_sent_state()
+
 
 @register(ClientPackets.TOURNAMENT_LEAVE_MATCH_CHANNEL)
 class TourneyMatchLeaveChannel(BasePacket):
@@ -1427,7 +1427,7 @@ async def mp_start(ctx: Context, match: Match) -> Optional[str]:
 
                 # make sure player didn't leave the
                 # match since queueing this start lol...
-                if ctx.player not in {slot.player for slot in match.slots}:
+                if ctx.player not in match:
                     match.chat.send_bot("Player left match? (cancelled)")
                     return
 
@@ -1592,7 +1592,7 @@ async def mp_host(ctx: Context, match: Match) -> Optional[str]:
     if target is match.host:
         return "They're already host, silly!"
 
-    if target not in {slot.player for slot in match.slots}:
+    if target not in match:
         return "Found no such player in the match."
 
     match.host_id = target.id
@@ -1642,13 +1642,13 @@ async def mp_addref(ctx: Context, match: Match) -> Optional[str]:
     if not target:
         return "Could not find a user by that name."
 
-    if target not in {slot.player for slot in match.slots}:
+    if target not in match:
         return "User must be in the current match!"
 
     if target in match.refs:
         return f"{target} is already a match referee!"
 
-    match._refs.add(target)
+    match.add_ref(target)
     return f"{target.name} added to match referees."
 
 
@@ -1669,7 +1669,7 @@ async def mp_rmref(ctx: Context, match: Match) -> Optional[str]:
     if target is match.host:
         return "The host is always a referee!"
 
-    match._refs.remove(target)
+    match.remove_ref(target)
     return f"{target.name} removed from match referees."
 
 
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from typing import Sequence
 from typing import TYPE_CHECKING
 
 import app.packets
@@ -133,8 +132,13 @@ class Channel:
             # the channel from the global list.
             app.state.sessions.channels.remove(self)
 
-    def enqueue(self, data: bytes, immune: Sequence[int] = []) -> None:
+    def enqueue(self, data: bytes, immune: frozenset[int] = frozenset()) -> None:
         """Enqueue `data` to all connected clients not in `immune`."""
+        if not immune:
+            for player in self.players:
+                player.enqueue(data)
+            return
+
         for player in self.players:
             if player.id not in immune:
                 player.enqueue(data)
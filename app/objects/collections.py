@@ -46,6 +46,13 @@ __all__ = (
 class Channels(list[Channel]):
     """The currently active chat channels on the server."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # cached result of looking up #lobby; see `lobby`.
+        self._lobby: Optional[Channel] = None
+        self._lobby_stale = True
+
     def __iter__(self) -> Iterator[Channel]:
         return super().__iter__()
 
@@ -94,17 +101,33 @@ class Channels(list[Channel]):
 
         return None
 
+    @property
+    def lobby(self) -> Optional[Channel]:
+        """The #lobby channel, cached until a #lobby is added or removed."""
+        if self._lobby_stale:
+            self._lobby = self.get_by_name("#lobby")
+            self._lobby_stale = False
+
+        return self._lobby
+
     def append(self, channel: Channel) -> None:
         """Append `channel` to the list."""
         super().append(channel)
 
+        if channel._name == "#lobby":
+            self._lobby_stale = True
+
         if app.settings.DEBUG:
             log(f"{channel} added to channels list.")
 
     def extend(self, channels: Iterable[Channel]) -> None:
         """Extend the list with `channels`."""
+        start = len(self)
         super().extend(channels)
 
+        if any(channel._name == "#lobby" for channel in self[start:]):
+            self._lobby_stale = True
+
         if app.settings.DEBUG:
             log(f"{channels} added to channels list.")
 
@@ -112,6 +135,9 @@ class Channels(list[Channel]):
         """Remove `channel` from the list."""
         super().remove(channel)
 
+        if channel is self._lobby or channel._name == "#lobby":
+            self._lobby_stale = True
+
         if app.settings.DEBUG:
             log(f"{channel} removed from channels list.")
 
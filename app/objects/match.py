@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import traceback
+from array import array
 from collections import defaultdict
 from datetime import datetime as datetime
 from datetime import timedelta as timedelta
@@ -42,6 +44,7 @@ __all__ = (
     "MapPool",
     "Slot",
     "Match",
+    "flush_state_updates",
 )
 
 
@@ -60,6 +63,30 @@ class SlotStatus(IntEnum):
     # has_player = not_ready | ready | no_map | playing | complete
 
 
+# plain int copies of slot statuses, for use in the hot paths
+# below where the enum member lookups would otherwise add up.
+_OPEN = int(SlotStatus.open)
+_NOT_READY = int(SlotStatus.not_ready)
+_READY = int(SlotStatus.ready)
+_NO_MAP = int(SlotStatus.no_map)
+_PLAYING = int(SlotStatus.playing)
+_HAS_PLAYER = 0b01111100
+
+_NOT_READY_BYTE = bytes((_NOT_READY,))
+
+# map each slot status to b"1" if it's counted in
+# the respective mask of `Match`, otherwise to b"0".
+_HAS_PLAYER_TABLE = bytes(b"01"[status & _HAS_PLAYER != 0] for status in range(256))
+_READY_TABLE = bytes(b"01"[status == _READY] for status in range(256))
+_PLAYING_TABLE = bytes(b"01"[status == _PLAYING] for status in range(256))
+
+
+def _status_mask(statuses: bytearray, table: bytes) -> int:
+    """Return a bitmask of the slots whose status `table` maps to b"1"."""
+    # bytes are reversed so that slot 0 ends up as the lowest bit.
+    return int(statuses.translate(table)[::-1], 2)
+
+
 @unique
 @pymysql_encode(escape_enum)
 class MatchTeams(IntEnum):
@@ -68,6 +95,10 @@ class MatchTeams(IntEnum):
     red = 2
 
 
+_NEUTRAL = int(MatchTeams.neutral)
+_NOMOD = int(Mods.NOMOD)
+
+
 """
 # implemented by osu! and send between client/server,
 # quite frequently even, but seems useless??
@@ -146,32 +177,156 @@ class MapPool:
 
 
 class Slot:
-    """An individual player slot in an osu! multiplayer match."""
+    """\
+    An individual player slot in an osu! multiplayer match.
+
+    The slot's player, status, team & mods are stored in parallel
+    arrays on the match (see `Match._statuses` etc.), and whether
+    it's loaded & skipped in bitmasks; this is a thin view over the
+    `idx`th element of each of them.
+    """
+
+    __slots__ = ("_match", "_idx")
+
+    def __init__(self, match: Match, idx: int) -> None:
+        self._match = match
+        self._idx = idx
+
+    @property
+    def player(self) -> Optional[Player]:
+        return self._match._players[self._idx]
+
+    @player.setter
+    def player(self, player: Optional[Player]) -> None:
+        # keep the match's player id -> slot index lookup in sync.
+        players = self._match._players
+        player_slot = self._match._player_slot
+        old_player = players[self._idx]
+
+        if old_player is not None:
+            # only drop the key if it still points to us; the
+            # player may have already been copied to a new slot.
+            if player_slot.get(old_player.id) == self._idx:
+                del player_slot[old_player.id]
+
+        if player is not None:
+            player_slot[player.id] = self._idx
+
+        players[self._idx] = player
+
+    @property
+    def status(self) -> SlotStatus:
+        return SlotStatus(self._match._statuses[self._idx])
+
+    @status.setter
+    def status(self, status: SlotStatus) -> None:
+        self._match._set_slot_status(self._idx, status)
+
+    @property
+    def team(self) -> MatchTeams:
+        return MatchTeams(self._match._teams[self._idx])
+
+    @team.setter
+    def team(self, team: MatchTeams) -> None:
+        self._match._teams[self._idx] = team
+
+    @property
+    def mods(self) -> Mods:
+        return Mods(self._match._slot_mods[self._idx])
+
+    @mods.setter
+    def mods(self, mods: Mods) -> None:
+        self._match._slot_mods[self._idx] = mods
 
-    def __init__(self) -> None:
-        self.player: Optional[Player] = None
-        self.status = SlotStatus.open
-        self.team = MatchTeams.neutral
-        self.mods = Mods.NOMOD
-        self.loaded = False
-        self.skipped = False
+    @property
+    def loaded(self) -> bool:
+        return self._match._loaded_mask & (1 << self._idx) != 0
+
+    @loaded.setter
+    def loaded(self, loaded: bool) -> None:
+        bit = 1 << self._idx
+        self._match._loaded_mask = self._match._loaded_mask & ~bit | (
+            bit if loaded else 0
+        )
+
+    @property
+    def skipped(self) -> bool:
+        return self._match._skipped_mask & (1 << self._idx) != 0
+
+    @skipped.setter
+    def skipped(self, skipped: bool) -> None:
+        bit = 1 << self._idx
+        self._match._skipped_mask = self._match._skipped_mask & ~bit | (
+            bit if skipped else 0
+        )
 
     def empty(self) -> bool:
-        return self.player is None
+        return self._match._players[self._idx] is None
 
     def copy_from(self, other: Slot) -> None:
-        self.player = other.player
-        self.status = other.status
-        self.team = other.team
-        self.mods = other.mods
+        # copy the raw values across, rather than
+        # building enums only to store them again.
+        src, src_idx = other._match, other._idx
+        dst, dst_idx = self._match, self._idx
+
+        self.player = src._players[src_idx]
+        dst._set_slot_status(dst_idx, src._statuses[src_idx])
+        dst._teams[dst_idx], dst._slot_mods[dst_idx] = (
+            src._teams[src_idx],
+            src._slot_mods[src_idx],
+        )
 
     def reset(self, new_status: SlotStatus = SlotStatus.open) -> None:
+        match, idx = self._match, self._idx
+
         self.player = None
-        self.status = new_status
-        self.team = MatchTeams.neutral
-        self.mods = Mods.NOMOD
-        self.loaded = False
-        self.skipped = False
+        match._set_slot_status(idx, new_status)
+        match._teams[idx], match._slot_mods[idx] = _NEUTRAL, _NOMOD
+
+        bit = 1 << idx
+        match._loaded_mask &= ~bit
+        match._skipped_mask &= ~bit
+
+
+# slots released by disbanded matches, to be reused by new ones.
+_SLOT_POOL: list[Slot] = []
+_SLOT_POOL_MAX_SIZE = 16 * app.settings.MAX_MATCHES
+
+
+def _acquire_slot(match: Match, idx: int) -> Slot:
+    """Return a slot for `match` from the pool, or a new one."""
+    if _SLOT_POOL:
+        slot = _SLOT_POOL.pop()
+        slot._match = match
+        slot._idx = idx
+        return slot
+
+    return Slot(match, idx)
+
+
+def flush_state_updates() -> None:
+    """\
+    Send the state of each match changed since the last flush.
+
+    This is called at the end of each bancho request, and is also
+    scheduled with `loop.call_soon` by the first `enqueue_state` after
+    a flush (even during a request), so that states changed outside of
+    a request are sent too; flushing with nothing queued is a no-op.
+    """
+    dirty_matches = app.state.sessions.dirty_matches
+
+    while dirty_matches:
+        # pop each match as it's sent (oldest first), so
+        # a failure doesn't lose the rest of the states.
+        match = next(iter(dirty_matches))
+        lobby, force = dirty_matches.pop(match)
+
+        try:
+            match._send_state(lobby, force)
+        except Exception:
+            # print exception info to the console, but don't
+            # break the response of whoever's flushing.
+            traceback.print_exc()
 
 
 class StartingTimers(TypedDict):
@@ -189,10 +344,29 @@ class Match:
     _refs: set[`Player`]
         A set of players who have access to mp commands in the match.
         These can be used with the !mp <addref/rmref/listref> commands.
+        Only modify this with `add_ref` & `remove_ref`, which keep the
+        frozenset returned by `refs` up to date.
 
     slots: list[`Slot`]
         A list of 16 `Slot` objects representing the match's slots.
 
+    _players, _statuses, _teams, _slot_mods
+        The per-slot data backing `slots`, stored as parallel arrays
+        so scans over the slots don't have to go through `Slot`.
+
+    _player_slot: dict[`int`, `int`]
+        A mapping of player ids to the index of the slot they occupy.
+        This is kept up to date by `Slot.player`'s setter.
+
+    _occupancy, _ready_mask, _playing_mask: `int`
+        Bitmasks of the slots which have a player, are ready & are
+        playing, where bit n represents slot n. These are kept up to
+        date with `_statuses` by `_set_slot_status`.
+
+    _loaded_mask, _skipped_mask: `int`
+        Bitmasks of the slots which have loaded & skipped, backing
+        `Slot.loaded` and `Slot.skipped`.
+
     starting: Optional[dict[str, `TimerHandle`]]
         Used when the match is started with !mp start <seconds>.
         It stores both the starting timer, and the chat alert timers.
@@ -221,12 +395,16 @@ class Match:
         seed: int,
         chat_channel: Channel,
     ) -> None:
+        self._url: Optional[str] = None
+        self._embed: Optional[str] = None
+
         self.id = id
         self.name = name
         self.passwd = password
 
-        self.host_id = host_id
         self._refs: set[Player] = set()
+        self._refs_snapshot: frozenset[Player] = frozenset()
+        self.host_id = host_id
 
         self.map_id = map_id
         self.map_md5 = map_md5
@@ -238,7 +416,14 @@ class Match:
         self.freemods = freemods
 
         self.chat = chat_channel
-        self.slots = [Slot() for _ in range(16)]
+        self._players: list[Optional[Player]] = [None] * 16
+        self._statuses = bytearray((_OPEN,)) * 16
+        self._teams = bytearray([MatchTeams.neutral]) * 16
+        self._slot_mods = array("I", [Mods.NOMOD]) * 16
+        self._player_slot: dict[int, int] = {}
+        self._occupancy = self._ready_mask = self._playing_mask = 0
+        self._loaded_mask = self._skipped_mask = 0
+        self.slots = [_acquire_slot(self, idx) for idx in range(16)]
 
         # self.type = MatchTypes.standard
         self.team_type = team_type
@@ -260,16 +445,60 @@ class Match:
 
         self.tourney_clients: set[int] = set()  # player ids
 
+        # the last state packets sent to the match & lobby;
+        # see `_send_state` and `invalidate_sent_state`.
+        self._last_state: Optional[bytes] = None
+        self._last_lobby_state: Optional[bytes] = None
+
     @property  # TODO: test cache speed
     def host(self) -> Player:
         player = app.state.sessions.players.get(id=self.host_id)
         assert player is not None
         return player
 
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @id.setter
+    def id(self, id: int) -> None:
+        self._id = id
+        self._url = self._embed = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name = name
+        self._embed = None
+
+    @property
+    def passwd(self) -> str:
+        return self._passwd
+
+    @passwd.setter
+    def passwd(self, passwd: str) -> None:
+        self._passwd = passwd
+        self._url = self._embed = None
+
+    @property
+    def host_id(self) -> int:
+        return self._host_id
+
+    @host_id.setter
+    def host_id(self, host_id: int) -> None:
+        self._host_id = host_id
+        self._update_refs()
+
     @property
     def url(self) -> str:
         """The match's invitation url."""
-        return f"osump://{self.id}/{self.passwd}"
+        if self._url is None:
+            self._url = f"osump://{self.id}/{self.passwd}"
+
+        return self._url
 
     @property
     def map_url(self):
@@ -279,7 +508,10 @@ class Match:
     @property
     def embed(self) -> str:
         """An osu! chat embed for `self`."""
-        return f"[{self.url} {self.name}]"
+        if self._embed is None:
+            self._embed = f"[{self.url} {self.name}]"
+
+        return self._embed
 
     @property
     def map_embed(self) -> str:
@@ -287,49 +519,109 @@ class Match:
         return f"[{self.map_url} {self.map_name}]"
 
     @property
-    def refs(self) -> set[Player]:
+    def refs(self) -> frozenset[Player]:
         """Return all players with referee permissions."""
-        refs = self._refs
+        return self._refs_snapshot
+
+    def _update_refs(self) -> None:
+        """Rebuild `refs` after the host or referees have changed."""
+        host = app.state.sessions.players.get(id=self.host_id)
 
-        if self.host is not None:
-            refs.add(self.host)
+        if host is not None:
+            self._refs_snapshot = frozenset((host, *self._refs))
+        else:
+            self._refs_snapshot = frozenset(self._refs)
+
+    def add_ref(self, player: Player) -> None:
+        """Give `player` referee permissions in the match."""
+        self._refs.add(player)
+        self._update_refs()
 
-        return refs
+    def remove_ref(self, player: Player) -> None:
+        """Remove `player`'s referee permissions in the match."""
+        self._refs.remove(player)
+        self._update_refs()
 
     def __repr__(self) -> str:
         return f"<{self.name} ({self.id})>"
 
+    def __contains__(self, player: Player) -> bool:
+        return self.get_slot_id(player) is not None
+
+    def has_player_id(self, player_id: int) -> bool:
+        """\
+        Return whether a session of the player `player_id` is in a slot.
+
+        Unlike `in`, this doesn't compare by identity, so it also
+        matches a user's other sessions (i.e. their tourney clients).
+        """
+        return player_id in self._player_slot
+
     def get_slot(self, player: Player) -> Optional[Slot]:
         """Return the slot containing a given player."""
-        for s in self.slots:
-            if player is s.player:
-                return s
-
-        return None
+        idx = self.get_slot_id(player)
+        return self.slots[idx] if idx is not None else None
 
     def get_slot_id(self, player: Player) -> Optional[int]:
         """Return the slot index containing a given player."""
-        for idx, s in enumerate(self.slots):
-            if player is s.player:
-                return idx
+        idx = self._player_slot.get(player.id)
+
+        # compare by identity; a stale player object
+        # sharing the same id isn't in the match.
+        if idx is None or self._players[idx] is not player:
+            return None
+
+        return idx
+
+    def player_count(self) -> int:
+        """Return the number of slots with a player."""
+        return bin(self._occupancy).count("1")
+
+    def ready_count(self) -> int:
+        """Return the number of slots with a ready player."""
+        return bin(self._ready_mask).count("1")
+
+    def playing_count(self) -> int:
+        """Return the number of slots with a player currently playing."""
+        return bin(self._playing_mask).count("1")
 
-        return None
+    def all_ready(self) -> bool:
+        """Return whether every player in the match is ready."""
+        return self._occupancy != 0 and self._ready_mask == self._occupancy
+
+    def all_loaded(self) -> bool:
+        """Return whether every playing player has loaded the map."""
+        return self._playing_mask & ~self._loaded_mask == 0
+
+    def all_skipped(self) -> bool:
+        """Return whether every playing player has requested a skip."""
+        return self._playing_mask & ~self._skipped_mask == 0
+
+    def _set_slot_status(self, idx: int, status: int) -> None:
+        """Set the status of the slot at `idx`, updating our masks."""
+        self._statuses[idx] = status
+
+        bit = 1 << idx
+        self._occupancy = self._occupancy & ~bit | (bit if status & _HAS_PLAYER else 0)
+        self._ready_mask = self._ready_mask & ~bit | (bit if status == _READY else 0)
+        self._playing_mask = self._playing_mask & ~bit | (
+            bit if status == _PLAYING else 0
+        )
+
+    def _update_status_masks(self) -> None:
+        """Recompute our masks after changing many slot statuses at once."""
+        self._occupancy = _status_mask(self._statuses, _HAS_PLAYER_TABLE)
+        self._ready_mask = _status_mask(self._statuses, _READY_TABLE)
+        self._playing_mask = _status_mask(self._statuses, _PLAYING_TABLE)
 
     def get_free(self) -> Optional[int]:
         """Return the first unoccupied slot in multi, if any."""
-        for idx, s in enumerate(self.slots):
-            if s.status == SlotStatus.open:
-                return idx
-
-        return None
+        idx = self._statuses.find(_OPEN)
+        return idx if idx != -1 else None
 
     def get_host_slot(self) -> Optional[Slot]:
         """Return the slot containing the host."""
-        for s in self.slots:
-            if s.player is not None and s.player is self.host:
-                return s
-
-        return None
+        return self.get_slot(self.host)
 
     def copy(self, m: Match) -> None:
         """Fully copy the data of another match obj."""
@@ -347,48 +639,113 @@ class Match:
         self,
         data: bytes,
         lobby: bool = True,
-        immune: Sequence[int] = [],
+        immune: frozenset[int] = frozenset(),
     ) -> None:
         """Add data to be sent to all clients in the match."""
         self.chat.enqueue(data, immune)
 
-        lchan = app.state.sessions.channels["#lobby"]
+        lchan = app.state.sessions.channels.lobby
         if lobby and lchan and lchan.players:
             lchan.enqueue(data)
 
-    def enqueue_state(self, lobby: bool = True) -> None:
-        """Enqueue `self`'s state to players in the match & lobby."""
-        # TODO: hmm this is pretty bad, writes twice
+    def enqueue_state(self, lobby: bool = True, force: bool = False) -> None:
+        """\
+        Enqueue `self`'s state to players in the match & lobby.
 
-        # send password only to users currently in the match.
-        self.chat.enqueue(app.packets.update_match(self, send_pw=True))
+        The state isn't sent immediately; changes to a match are
+        coalesced, and its state is sent once by `flush_state_updates`
+        at the end of the current request (or event loop iteration).
 
-        lchan = app.state.sessions.channels["#lobby"]
+        A state identical to the last one sent is skipped, unless
+        `force` is set; use it when overruling a client's own state.
+        """
+        dirty_matches = app.state.sessions.dirty_matches
+
+        if not dirty_matches:
+            # nothing is queued yet; make sure the states are sent even
+            # if we weren't called while handling a bancho request (if we
+            # were, the request's own flush leaves this call a no-op).
+            app.state.loop.call_soon(flush_state_updates)
+
+        prev_lobby, prev_force = dirty_matches.get(self, (False, False))
+        dirty_matches[self] = (prev_lobby or lobby, prev_force or force)
+
+    def _send_state(self, lobby: bool = True, force: bool = False) -> None:
+        """Send `self`'s state to players in the match & lobby."""
+        # serialize once, with & without the password.
+        with_pw, without_pw = app.packets.update_match_pair(self)
+
+        # callers often re-send an unchanged state, so skip
+        # any state identical to what was last sent.
+        if force or with_pw != self._last_state:
+            # send password only to users currently in the match.
+            self.chat.enqueue(with_pw)
+            self._last_state = with_pw
+
+        lchan = app.state.sessions.channels.lobby
         if lobby and lchan and lchan.players:
-            lchan.enqueue(app.packets.update_match(self, send_pw=False))
+            if force or without_pw != self._last_lobby_state:
+                lchan.enqueue(without_pw)
+                self._last_lobby_state = without_pw
+        else:
+            # the lobby wasn't sent this state; whoever joins it
+            # next mustn't have their state compared against it.
+            self._last_lobby_state = None
+
+    def invalidate_sent_state(self) -> None:
+        """\
+        Forget the last states sent to the match & lobby.
+
+        Call this whenever `self`'s state is handed out other than
+        by `_send_state`, so the next state is sent even if unchanged.
+        """
+        self._last_state = None
+        self._last_lobby_state = None
 
     def unready_players(self, expected: SlotStatus = SlotStatus.ready) -> None:
         """Unready any players in the `expected` state."""
-        for s in self.slots:
-            if s.status == expected:
-                s.status = SlotStatus.not_ready
+        self._statuses = self._statuses.replace(bytes((expected,)), _NOT_READY_BYTE)
+        self._update_status_masks()
 
     def start(self) -> None:
         """Start the match for all ready players with the map."""
-        no_map: list[int] = []
+        statuses = self._statuses
 
-        for s in self.slots:
-            # start each player who has the map.
-            if s.player is not None:
-                if s.status != SlotStatus.no_map:
-                    s.status = SlotStatus.playing
-                else:
-                    no_map.append(s.player.id)
+        # players without the map won't be sent the start packet.
+        no_map = frozenset(
+            player_id
+            for player_id, idx in self._player_slot.items()
+            if statuses[idx] == _NO_MAP
+        )
+
+        # start each player who has the map; this includes
+        # players in slots which have since been locked.
+        for idx in self._player_slot.values():
+            if statuses[idx] != _NO_MAP:
+                statuses[idx] = _PLAYING
+
+        self._update_status_masks()
 
         self.in_progress = True
         self.enqueue(app.packets.match_start(self), immune=no_map, lobby=False)
         self.enqueue_state()
 
+    def destroy(self) -> None:
+        """Release `self`'s slots back to the pool once disbanded."""
+        for s in self.slots:
+            s.reset()
+
+            # stale references to the slot must not reach a new match.
+            s._match = None  # type: ignore[assignment]
+
+            if len(_SLOT_POOL) < _SLOT_POOL_MAX_SIZE:
+                _SLOT_POOL.append(s)
+
+        self.slots = []
+
+        # there's no longer anything to send.
+        app.state.sessions.dirty_matches.pop(self, None)
+
     def reset_scrim(self) -> None:
         """Reset the current scrim's winning points & bans."""
         self.match_points.clear()
@@ -397,7 +754,7 @@ class Match:
 
     async def await_submissions(
         self,
-        was_playing: Sequence[Slot],
+        was_playing: Sequence[tuple[Player, MatchTeams]],
     ) -> tuple[dict[Union[MatchTeams, Player], int], Sequence[Player]]:
         """Await score submissions from all players in completed state."""
         scores: dict[Union[MatchTeams, Player], int] = defaultdict(int)
@@ -417,11 +774,11 @@ class Match:
             # map isn't submitted
             return {}, ()
 
-        for s in was_playing:
+        for player, team in was_playing:
             # continue trying to fetch each player's
             # scores until they've all been submitted.
             while True:
-                rc_score = s.player.recent_score
+                rc_score = player.recent_score
                 max_age = datetime.now() - timedelta(
                     seconds=bmap.total_length + time_waited + 0.5,
                 )
@@ -434,7 +791,7 @@ class Match:
                     # score found, add to our scores dict if != 0.
                     score = getattr(rc_score, win_cond)
                     if score:
-                        key = s.player if ffa else s.team
+                        key = player if ffa else team
                         scores[key] += score
 
                     break
@@ -446,13 +803,16 @@ class Match:
                 if time_waited > 10:
                     # inform the match this user didn't
                     # submit a score in time, and skip them.
-                    didnt_submit.append(s.player)
+                    didnt_submit.append(player)
                     break
 
         # all scores retrieved, update the match.
         return scores, didnt_submit
 
-    async def update_matchpoints(self, was_playing: Sequence[Slot]) -> None:
+    async def update_matchpoints(
+        self,
+        was_playing: Sequence[tuple[Player, MatchTeams]],
+    ) -> None:
         """\
         Determine the winner from `scores`, increment & inform players.
 
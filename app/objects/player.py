@@ -660,7 +660,7 @@ class Player:
             log(f"{self} failed to join {match.chat}.", Ansi.LYELLOW)
             return False
 
-        lobby = app.state.sessions.channels["#lobby"]
+        lobby = app.state.sessions.channels.lobby
         if lobby in self.channels:
             self.leave_channel(lobby)
 
@@ -714,8 +714,9 @@ class Player:
                 self.match.starting = None
 
             app.state.sessions.matches.remove(self.match)
+            self.match.destroy()
 
-            lobby = app.state.sessions.channels["#lobby"]
+            lobby = app.state.sessions.channels.lobby
             if lobby:
                 lobby.enqueue(app.packets.dispose_match(self.match.id))
 
@@ -729,7 +730,7 @@ class Player:
                         break
 
             if self in self.match._refs:
-                self.match._refs.remove(self)
+                self.match.remove_ref(self)
                 self.match.chat.send_bot(f"{self.name} removed from match referees.")
 
             # notify others of our deprature
@@ -207,8 +207,7 @@ class ReplayAction(IntEnum):
     WatchingOther = 8
 
 
-@dataclass
-class ScoreFrame:
+class ScoreFrame(NamedTuple):
     time: int
     id: int
     num300: int
@@ -517,14 +516,15 @@ class BanchoPacketReader:
         return match
 
     def read_scoreframe(self) -> ScoreFrame:
-        sf = ScoreFrame(*SCOREFRAME_FMT.unpack_from(self.body_view[:29]))
+        fields = SCOREFRAME_FMT.unpack_from(self.body_view[:29])
         self.body_view = self.body_view[29:]
 
-        if sf.score_v2:
-            sf.combo_portion = self.read_f64()
-            sf.bonus_portion = self.read_f64()
+        if fields[-1]:  # score_v2
+            combo_portion = self.read_f64()
+            bonus_portion = self.read_f64()
+            return ScoreFrame(*fields, combo_portion, bonus_portion)
 
-        return sf
+        return ScoreFrame(*fields)
 
     def read_replayframe(self) -> ReplayFrame:
         return ReplayFrame(
@@ -622,42 +622,58 @@ def write_channel(name: str, topic: str, count: int) -> bytearray:
 #    return ret
 
 
-def write_match(m: Match, send_pw: bool = True) -> bytearray:
-    """Write `m` into bytes (osu! match)."""
+SLOT_MODS_FMT = struct.Struct("<16I")
+
+
+def write_match_parts(m: Match) -> tuple[bytearray, bytes, bytes, bytearray]:
+    """\
+    Write `m` into bytes (osu! match), split around the password.
+
+    Returns the data before the password, the password as sent to
+    players in the match, the password as sent to everyone else, and
+    the data after the password; this allows both variants of the
+    match to be built from a single serialization.
+    """
     # 0 is for match type
-    ret = bytearray(struct.pack("<HbbI", m.id, m.in_progress, 0, m.mods))
-    ret += write_string(m.name)
+    prefix = bytearray(struct.pack("<HbbI", m.id, m.in_progress, 0, m.mods))
+    prefix += write_string(m.name)
 
     # osu expects \x0b\x00 if there's a password, but it's
     # not being sent, and \x00 if there's no password.
     if m.passwd:
-        if send_pw:
-            ret += write_string(m.passwd)
-        else:
-            ret += b"\x0b\x00"
+        passwd = write_string(m.passwd)
+        hidden_passwd = b"\x0b\x00"
     else:
-        ret += b"\x00"
+        passwd = hidden_passwd = b"\x00"
 
-    ret += write_string(m.map_name)
-    ret += m.map_id.to_bytes(4, "little", signed=True)
-    ret += write_string(m.map_md5)
+    suffix = bytearray(write_string(m.map_name))
+    suffix += m.map_id.to_bytes(4, "little", signed=True)
+    suffix += write_string(m.map_md5)
 
-    ret.extend([s.status for s in m.slots])
-    ret.extend([s.team for s in m.slots])
+    suffix += m._statuses
+    suffix += m._teams
 
-    for s in m.slots:
-        if s.status & 0b01111100 != 0:  # SlotStatus.has_player
-            ret += s.player.id.to_bytes(4, "little")
+    for status, player in zip(m._statuses, m._players):
+        if status & 0b01111100 != 0:  # SlotStatus.has_player
+            suffix += player.id.to_bytes(4, "little")
 
-    ret += m.host.id.to_bytes(4, "little")
-    ret.extend((m.mode, m.win_condition, m.team_type, m.freemods))
+    suffix += m.host.id.to_bytes(4, "little")
+    suffix.extend((m.mode, m.win_condition, m.team_type, m.freemods))
 
     if m.freemods:
-        for s in m.slots:
-            ret += s.mods.to_bytes(4, "little")
+        suffix += SLOT_MODS_FMT.pack(*m._slot_mods)
 
-    ret += m.seed.to_bytes(4, "little")
-    return ret
+    suffix += m.seed.to_bytes(4, "little")
+    return prefix, passwd, hidden_passwd, suffix
+
+
+def write_match(m: Match, send_pw: bool = True) -> bytearray:
+    """Write `m` into bytes (osu! match)."""
+    prefix, passwd, hidden_passwd, suffix = write_match_parts(m)
+
+    prefix += passwd if send_pw else hidden_passwd
+    prefix += suffix
+    return prefix
 
 
 SCOREFRAME_FMT = struct.Struct("<iBHHHHHHiHH?BB?")
@@ -941,6 +957,19 @@ def update_match(m: Match, send_pw: bool = True) -> bytes:
     return write(ServerPackets.UPDATE_MATCH, ((m, send_pw), osuTypes.match))
 
 
+# packet id: 26
+def update_match_pair(m: Match) -> tuple[bytes, bytes]:
+    """Write `m`'s update packet both with & without its password."""
+    prefix, passwd, hidden_passwd, suffix = write_match_parts(m)
+
+    def _write(passwd: bytes) -> bytes:
+        size = len(prefix) + len(passwd) + len(suffix)
+        header = struct.pack("<HxI", ServerPackets.UPDATE_MATCH, size)
+        return b"".join((header, prefix, passwd, suffix))
+
+    return _write(passwd), _write(hidden_passwd)
+
+
 # packet id: 27
 def new_match(m: Match) -> bytes:
     return write(ServerPackets.NEW_MATCH, ((m, True), osuTypes.match))
@@ -13,6 +13,7 @@ from app.objects.collections import Players
 
 if TYPE_CHECKING:
     from app.objects.achievement import Achievement
+    from app.objects.match import Match
     from app.objects.player import Player
 
 players = Players()
@@ -22,6 +23,10 @@ clans = Clans()
 matches = Matches()
 achievements: list[Achievement] = []
 
+# matches with a state update pending, and whether the
+# update should also be sent to the lobby & be forced.
+dirty_matches: dict[Match, tuple[bool, bool]] = {}
+
 api_keys: dict[str, int] = {}
 
 housekeeping_tasks: set[asyncio.Task] = set()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import app.state
+from app.constants.gamemodes import GameMode
+from app.constants.mods import Mods
+from app.objects.channel import Channel
+from app.objects.collections import Channels
+from app.objects.collections import Matches
+from app.objects.collections import Players
+from app.objects.match import Match
+from app.objects.match import MatchTeams
+from app.objects.match import MatchTeamTypes
+from app.objects.match import MatchWinConditions
+from app.objects.match import SlotStatus
+from app.objects.player import Player
+
+
+@pytest.fixture
+def loop(monkeypatch):
+    # match states are flushed with call_soon.
+    loop = asyncio.new_event_loop()
+    monkeypatch.setattr(app.state, "loop", loop, raising=False)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Replace the global sessions used by matches with empty ones."""
+    lobby = Channel(name="#lobby", topic="", auto_join=False)
+    monkeypatch.setattr(app.state.sessions, "players", Players())
+    monkeypatch.setattr(app.state.sessions, "channels", Channels([lobby]))
+    monkeypatch.setattr(app.state.sessions, "matches", Matches())
+    monkeypatch.setattr(app.state.sessions, "dirty_matches", {})
+    return app.state.sessions
+
+
+@pytest.fixture
+def match(loop, sessions):
+    """A team vs. match with 4 players (1 being the host) in its channel."""
+    players = [Player(id=i, name=f"player{i}", priv=1) for i in range(1, 5)]
+    sessions.players.extend(players)
+
+    m = Match(
+        id=1,
+        name="test match",
+        password="",
+        map_name="artist - title [diff]",
+        map_id=1,
+        map_md5="0" * 32,
+        host_id=1,
+        mode=GameMode.VANILLA_OSU,
+        mods=Mods.HIDDEN,
+        win_condition=MatchWinConditions.score,
+        team_type=MatchTeamTypes.team_vs,
+        freemods=False,
+        seed=0,
+        chat_channel=Channel(name="#multi_1", topic="", auto_join=False),
+    )
+
+    statuses = (
+        SlotStatus.ready,
+        SlotStatus.not_ready,
+        SlotStatus.no_map,
+        SlotStatus.ready,
+    )
+    for idx, (player, status) in enumerate(zip(players, statuses)):
+        m.slots[idx].player = player
+        m.slots[idx].status = status
+        m.slots[idx].team = MatchTeams.red if idx % 2 else MatchTeams.blue
+
+    # the last player sits in a slot locked after they joined.
+    m.slots[3].status = SlotStatus.locked
+    m.slots[7].status = SlotStatus.locked
+
+    for player in players:
+        m.chat.append(player)
+
+    return m
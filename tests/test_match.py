@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import pytest
+
+import app.packets
+from app.api.domains.cho import LobbyJoin
+from app.api.domains.cho import TourneyMatchJoinChannel
+from app.constants.privileges import Privileges
+from app.objects.match import flush_state_updates
+from app.objects.match import Match
+from app.objects.match import SlotStatus
+from app.objects.player import Player
+from app.packets import BanchoPacketReader
+
+
+def assert_slot_invariants(m: Match) -> None:
+    """Assert `m`'s masks & player index agree with its slots."""
+    has_player = (
+        SlotStatus.not_ready
+        | SlotStatus.ready
+        | SlotStatus.no_map
+        | SlotStatus.playing
+        | SlotStatus.complete
+    )
+    occupied = [s for s in m.slots if s.status & has_player]
+    playing = [s for s in m.slots if s.status == SlotStatus.playing]
+
+    for idx, s in enumerate(m.slots):
+        bit = 1 << idx
+        assert bool(m._occupancy & bit) == bool(s.status & has_player)
+        assert bool(m._ready_mask & bit) == (s.status == SlotStatus.ready)
+        assert bool(m._playing_mask & bit) == (s.status == SlotStatus.playing)
+
+        if s.player is not None:
+            assert m.get_slot_id(s.player) == idx
+            assert m.get_slot(s.player) is s
+            assert s.player in m
+
+    assert len(m._player_slot) == sum(s.player is not None for s in m.slots)
+    assert m.playing_count() == len(playing)
+    assert m.all_ready() == (
+        bool(occupied) and all(s.status == SlotStatus.ready for s in occupied)
+    )
+    assert m.all_loaded() == all(s.loaded for s in playing)
+    assert m.all_skipped() == all(s.skipped for s in playing)
+
+
+def _move_player(m: Match) -> None:
+    m.slots[5].copy_from(m.slots[1])
+    m.slots[1].reset()
+
+
+def _start_and_load(m: Match) -> None:
+    m.start()
+    m.slots[0].loaded = m.slots[0].skipped = True
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        _move_player,
+        lambda m: m.slots[0].reset(new_status=SlotStatus.locked),
+        lambda m: m.start(),
+        _start_and_load,
+        lambda m: m.unready_players(),
+        lambda m: m.unready_players(expected=SlotStatus.no_map),
+    ],
+    ids=[
+        "copy_from",
+        "reset",
+        "start",
+        "start_and_load",
+        "unready_players",
+        "unready_no_map",
+    ],
+)
+def test_match_slot_invariants(match, operation):
+    assert_slot_invariants(match)
+    operation(match)
+    assert_slot_invariants(match)
+
+
+def test_match_start_statuses(match):
+    match.start()
+
+    # players without the map aren't started; the others
+    # are, even if their slot has since been locked.
+    assert [s.status for s in match.slots[:5]] == [
+        SlotStatus.playing,
+        SlotStatus.playing,
+        SlotStatus.no_map,
+        SlotStatus.playing,
+        SlotStatus.open,
+    ]
+    assert match.slots[7].status == SlotStatus.locked
+    assert match.playing_count() == 3
+    assert not match.all_loaded()
+
+
+@pytest.fixture
+def lobby_player(sessions):
+    player = Player(id=10, name="lobby player", priv=1)
+    sessions.channels.lobby.append(player)
+    return player
+
+
+def assert_queues(m: Match, lobby_player: Player, lobby: bool = True) -> None:
+    """Assert the match & lobby were sent `m`'s current state once."""
+    with_pw = app.packets.update_match(m, send_pw=True)
+    without_pw = app.packets.update_match(m, send_pw=False)
+
+    for player in m.chat.players:
+        assert player.dequeue() == with_pw
+
+    assert lobby_player.dequeue() == (without_pw if lobby else None)
+
+
+def test_enqueue_state_coalesced(match, sessions, lobby_player):
+    match.enqueue_state()
+    match.slots[1].status = SlotStatus.ready
+    match.enqueue_state()
+
+    # nothing is sent before the flush.
+    assert sessions.dirty_matches == {match: (True, False)}
+    assert all(p.dequeue() is None for p in match.chat.players)
+    assert lobby_player.dequeue() is None
+
+    flush_state_updates()
+
+    assert not sessions.dirty_matches
+    assert_queues(match, lobby_player)
+
+
+@pytest.mark.parametrize(
+    ("calls", "expected"),
+    [
+        ([{"lobby": False}], (False, False)),
+        ([{"lobby": False}, {}], (True, False)),
+        ([{}, {"lobby": False}], (True, False)),
+        ([{"force": True}, {"lobby": False}], (True, True)),
+        ([{"lobby": False}, {"lobby": False, "force": True}], (False, True)),
+    ],
+)
+def test_enqueue_state_flags_merged(match, sessions, lobby_player, calls, expected):
+    for kwargs in calls:
+        match.enqueue_state(**kwargs)
+
+    assert sessions.dirty_matches == {match: expected}
+
+    flush_state_updates()
+    assert_queues(match, lobby_player, lobby=expected[0])
+
+
+def test_enqueue_state_flushed_by_loop(match, loop, lobby_player):
+    match.enqueue_state()
+
+    # run a single iteration of the loop.
+    loop.call_soon(loop.stop)
+    loop.run_forever()
+
+    assert_queues(match, lobby_player)
+
+
+def test_destroy_drops_pending_state(match, sessions, lobby_player):
+    match.enqueue_state()
+    match.destroy()
+
+    assert not sessions.dirty_matches
+
+    flush_state_updates()
+    assert all(p.dequeue() is None for p in match.chat.players)
+    assert lobby_player.dequeue() is None
+
+
+def test_flush_state_updates_continues_after_failure(
+    match,
+    sessions,
+    lobby_player,
+    capsys,
+):
+    class BrokenMatch:
+        def _send_state(self, lobby: bool, force: bool) -> None:
+            raise RuntimeError("failed to send state")
+
+    sessions.dirty_matches[BrokenMatch()] = (True, False)
+    match.enqueue_state()
+
+    flush_state_updates()
+
+    assert not sessions.dirty_matches
+    assert "failed to send state" in capsys.readouterr().err
+    assert_queues(match, lobby_player)
+
+
+def send_state(m: Match, **kwargs) -> None:
+    m.enqueue_state(**kwargs)
+    flush_state_updates()
+
+
+def test_unchanged_state_not_resent(match, lobby_player):
+    send_state(match)
+    assert_queues(match, lobby_player)
+
+    send_state(match)
+    assert all(p.dequeue() is None for p in match.chat.players)
+    assert lobby_player.dequeue() is None
+
+    match.slots[1].status = SlotStatus.ready
+    send_state(match)
+    assert_queues(match, lobby_player)
+
+
+def test_forced_state_resent(match, lobby_player):
+    send_state(match)
+    assert_queues(match, lobby_player)
+
+    send_state(match, force=True)
+    assert_queues(match, lobby_player)
+
+
+def test_state_sent_to_lobby_after_reentry(match, sessions, loop):
+    match.slots[3].status = SlotStatus.not_ready
+    match.unready_players()
+    sessions.matches.append(match)
+
+    lobby = sessions.channels.lobby
+    lobby_player = Player(id=10, name="lobby player", priv=1)
+    lobby.append(lobby_player)
+
+    send_state(match)
+    assert_queues(match, lobby_player)
+
+    # the lobby empties, and the match starts without it.
+    lobby.remove(lobby_player)
+    match.start()
+    flush_state_updates()
+    lobby_player.dequeue()  # from match_start
+
+    # someone joins the lobby, and is sent the match in progress.
+    new_player = Player(id=11, name="new player", priv=1)
+    lobby.append(new_player)
+    packet = LobbyJoin(BanchoPacketReader(memoryview(b""), {}))
+    loop.run_until_complete(packet.handle(new_player))
+    assert new_player.dequeue() == app.packets.new_match(match)
+
+    # the match completes, returning to the state first sent to the
+    # lobby; it must still reach the new player, who hasn't seen it.
+    match.unready_players(expected=SlotStatus.playing)
+    match.in_progress = False
+    send_state(match)
+
+    assert new_player.dequeue() == app.packets.update_match(match, send_pw=False)
+
+
+def test_state_sent_to_joining_tourney_client(match, sessions, loop):
+    sessions.matches.append(match)
+    send_state(match)
+
+    client = Player(
+        id=10,
+        name="tourney client",
+        priv=Privileges.UNRESTRICTED | Privileges.DONATOR,
+    )
+    reader = BanchoPacketReader(memoryview(match.id.to_bytes(4, "little")), {})
+    loop.run_until_complete(TourneyMatchJoinChannel(reader).handle(client))
+
+    assert client in match.chat
+    client.dequeue()  # from joining the channel
+
+    send_state(match)
+    assert client.dequeue() == app.packets.update_match(match, send_pw=True)
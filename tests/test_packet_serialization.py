@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 import app.packets
+from app.constants.mods import Mods
 
 
 @pytest.mark.parametrize(
@@ -667,3 +668,20 @@ def test_write_match_abort():
 )
 def test_write_switch_tournament_server(test_input, expected):
     assert app.packets.switch_tournament_server(test_input) == expected
+
+
+@pytest.mark.parametrize(
+    ("password", "freemods"),
+    [("", False), ("hunter2", False), ("", True), ("hunter2", True)],
+)
+def test_write_update_match_pair(match, password, freemods):
+    match.passwd = password
+    match.freemods = freemods
+    if freemods:
+        match.slots[0].mods = Mods.HIDDEN | Mods.HARDROCK
+        match.slots[1].mods = Mods.NOFAIL
+
+    assert app.packets.update_match_pair(match) == (
+        app.packets.update_match(match, send_pw=True),
+        app.packets.update_match(match, send_pw=False),
+    )